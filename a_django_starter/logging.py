@@ -54,6 +54,11 @@ LOGGING = {
             "handlers": ["console"],
             "propagate": False,
         },
+        "a_django_starter": {  # startup banner (accounts.apps.AccountsConfig.ready)
+            "level": "INFO",
+            "handlers": ["console"],
+            "propagate": False,
+        },
         "django.template": {
             "level": "DEBUG",
             "handlers": ["file"],
@@ -1,6 +1,6 @@
 
 from pathlib import Path
-from decouple import config
+from decouple import Config, RepositoryEnv, RepositoryEmpty
 from .logging import LOGGING
 from django.utils.translation import gettext_lazy as _
 
@@ -10,6 +10,11 @@ from django.utils.translation import gettext_lazy as _
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# explicit .env repository, parsed once (decouple's AutoConfig searches the caller's directory tree for it)
+# environment variables still take precedence over the file; no .env -> environment only
+_ENV_FILE = BASE_DIR / '.env'
+config = Config(RepositoryEnv(_ENV_FILE) if _ENV_FILE.is_file() else RepositoryEmpty())
+
 DJANGO_SECRET_KEY = config('DJANGO_SECRET_KEY', cast=str)
 DJANGO_IS_PRODUCTION = config('DJANGO_IS_PRODUCTION', default=True, cast=bool)
 DJANGO_ALLOWED_HOSTS = [h.strip() for h in config('DJANGO_ALLOWED_HOSTS', default='').split(',') if h.strip()]
@@ -22,14 +27,8 @@ else:
 
 DJANGO_BROWSER_RELOAD = config('DJANGO_BROWSER_RELOAD', default=False, cast=bool)
 
-print(
-    "[==================]\n"
-    f"Production: {DJANGO_IS_PRODUCTION}\n"
-    f"DATABASE: {DB_TYPE}\n"
-    f"Hosts: {DJANGO_ALLOWED_HOSTS}\n"
-    f"HMR: {DJANGO_BROWSER_RELOAD}\n"
-    "[==================]\n"
-)
+# ? the startup banner (production / database / hosts / HMR) is logged by accounts.apps.AccountsConfig.ready(),
+# ? LOGGING is only applied by django.setup(), anything logged here would have no handler yet
 
 # * ----------------------------------------------------------------------------------------------------
 # * Security settings 
@@ -38,8 +37,6 @@ SECRET_KEY = DJANGO_SECRET_KEY
 
 DEBUG = not DJANGO_IS_PRODUCTION
 
-HTML_MINIFY = not DEBUG #django-htmlmin
-
 ALLOWED_HOSTS = DJANGO_ALLOWED_HOSTS
 
 INTERNAL_IPS = ["127.0.0.1"]
@@ -54,16 +51,34 @@ if DJANGO_IS_PRODUCTION:
 SECURE_SSL_REDIRECT = DJANGO_IS_PRODUCTION #possible infinite redirect error
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')#when nginx does the SSL
 
+# ! accounts.utils.api_utils.request_rate_limit needs a cache shared by every worker (the default LocMemCache is per-process):
+# ! use django-redis (optional dependency, 'django_redis.cache.RedisCache') in production to get its exact Lua sliding window,
+# ! Django's built-in RedisCache or Memcached also work but only give the fixed window (atomic cache.incr) fallback.
+# ! cached_db sessions and a shared cache go together: with the per-process LocMemCache a logout/flush only
+# ! clears the worker that served it (others keep the logged-in session) and 2FA state written by one worker is
+# ! missing in the next. So: REDIS_URL set -> shared Redis cache + cache-first sessions, else plain DB sessions.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',  # or 'django_redis.cache.RedisCache' (see above)
+            'LOCATION': REDIS_URL,
+        }
+    }
+    # cache-first sessions: reads hit the cache, the DB only keeps the sessions durable across restarts
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+else:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_SAMESITE = 'Lax'
 SESSION_COOKIE_AGE = 5184000 #60 days
 SESSION_COOKIE_SECURE = DJANGO_IS_PRODUCTION # Ensure session cookies are only sent over HTTPS
 SESSION_COOKIE_HTTPONLY = True
 
 CSRF_COOKIE_SECURE = DJANGO_IS_PRODUCTION #Ensure CSRF cookies are only sent over HTTPS
-CSRF_TRUSTED_ORIGINS = [    
+CSRF_TRUSTED_ORIGINS = (
         "http://localhost:8000",
         "http://127.0.0.1:8000",  
-    ] + [f"https://{host}" for host in DJANGO_ALLOWED_HOSTS]
+    ) + tuple(f"https://{host}" for host in DJANGO_ALLOWED_HOSTS)
 CSRF_COOKIE_HTTPONLY = True
 CSRF_FAILURE_VIEW = "accounts.views.csrf_failure"#to override django's 403_csrf.html in django.views.csrf.csrf_failure
 
@@ -82,8 +97,9 @@ SECURE_REFERRER_POLICY = "strict-origin-when-cross-origin" # cuz 'strict-origin'
 # * ----------------------------------------------------------------------------------------------------------
 # * app definitions
 # * ----------------------------------------------------------------------------------------------------------
+# ? tuples: these are never mutated at runtime (extend them with += (...,) like the browser reload block below)
 # Application definition
-INSTALLED_APPS = [
+INSTALLED_APPS = (
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -96,10 +112,11 @@ INSTALLED_APPS = [
     #local apps
     'accounts',
     'home',#can delete
-]
+)
 
-MIDDLEWARE = [
+MIDDLEWARE = (
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # right after SecurityMiddleware, serves collected static files
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -108,8 +125,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     
     #3rd party
-    "htmlmin.middleware.HtmlMinifyMiddleware",
-    "htmlmin.middleware.MarkRequestMiddleware",
+    # no per-response HTML minification here: nginx compresses responses (see nginx/starter-file-for-nginx)
     'django.middleware.locale.LocaleMiddleware',#translation
     
     #local
@@ -118,7 +134,7 @@ MIDDLEWARE = [
 
     
 
-]
+)
 
 ROOT_URLCONF = 'a_django_starter.urls'
 
@@ -126,15 +142,22 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / "templates", BASE_DIR / "accounts/templates",],
-        'APP_DIRS': True,
+        # 'APP_DIRS' must stay unset when 'loaders' is given
         'OPTIONS': {
-            'context_processors': [
+            # compiled templates kept in memory (runserver's autoreloader still resets them on template edits)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+            'context_processors': (
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
 
                 'accounts.context_processors.current_language_context',
-            ],
+            ),
         },
     },
 ]
@@ -165,14 +188,22 @@ else:  # Switch to PostgreSQL
             'PASSWORD': config('DB_PASSWORD'),
             'HOST': config('DB_HOST'),
             'PORT': config('DB_PORT', default='5432', cast=int),
+            # persistent connections: skip the TCP/TLS/auth handshake on every request
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,  # drop dead connections before reuse
+            'OPTIONS': {
+                'sslmode': config('DB_SSLMODE', default='prefer'),  # 'require' in production
+                'connect_timeout': 5,
+            },
         }
     }
+    # ? with PgBouncer in transaction pooling mode: point DB_HOST/DB_PORT at it and set DB_CONN_MAX_AGE=0
 
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
-AUTH_PASSWORD_VALIDATORS = [
+AUTH_PASSWORD_VALIDATORS = (
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
     },
@@ -185,7 +216,7 @@ AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
-]
+)
 
 
 # * ----------------------------------------------------------------------------------------------------------
@@ -195,19 +226,19 @@ AUTH_PASSWORD_VALIDATORS = [
 LANGUAGE_CODE = 'en'
 
 # Supported languages (language codes must match the ones in locale folders)
-LANGUAGES = [
+LANGUAGES = (
     ('en', _('English')),
     ('fr', _('French')),
-]
+)
 
 TIME_ZONE = 'Africa/Tunis'
 USE_I18N = True
 USE_TZ = True
 
 # https://docs.djangoproject.com/en/dev/ref/settings/#locale-paths
-LOCALE_PATHS = [
+LOCALE_PATHS = (
     BASE_DIR / "locale",
-]
+)
 
 
 # * ----------------------------------------------------------------------------------------------------------
@@ -220,6 +251,8 @@ AUTHENTICATION_BACKENDS = [
 AUTH_USER_MODEL = "accounts.User"
 
 LOGIN_REDIRECT_URL = '/'
+# ? keep URL names here, not reverse_lazy(): resolve_url() reverses a name once, while a lazy proxy
+# ? is reversed (it doesn't memoize) and its path then goes through a second, failing reverse()
 LOGIN_URL = 'accounts:login'  # Namespace is specified as 'accounts'
 LOGOUT_REDIRECT_URL = 'accounts:login'
 
@@ -232,12 +265,13 @@ LOGOUT_REDIRECT_URL = 'accounts:login'
 # Static & Media
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_DIRS = [BASE_DIR / 'static']
+STATICFILES_DIRS = (BASE_DIR / 'static',)
 
 #versioning (STATICFILES_STORAGE is deprecated since 5.1)
+# whitenoise: hashed names like ManifestStaticFilesStorage + .gz/.br variants written at collectstatic time
 STORAGES = {
     "staticfiles": {
-        "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage",
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
@@ -286,8 +320,8 @@ PAYMEE_API_KEY = config('PAYMEE_API_KEY', cast=str, default=None)
 # * Development auto reload
 # * ----------------------------------------------------------------------------------------------------------
 if DJANGO_BROWSER_RELOAD and DEBUG:
-    INSTALLED_APPS += ['django_browser_reload']
-    MIDDLEWARE += ["django_browser_reload.middleware.BrowserReloadMiddleware"]
+    INSTALLED_APPS += ('django_browser_reload',)
+    MIDDLEWARE += ("django_browser_reload.middleware.BrowserReloadMiddleware",)
 
 # * ----------------------------------------------------------------------------------------------------------
 # * Extras
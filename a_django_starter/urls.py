@@ -14,18 +14,32 @@ Ensure all URLs use `gettext`, e.g., `path(_('login/'))`
 """
 
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from django.views.generic.base import TemplateView
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from functools import lru_cache
 
+from accounts.views import custom_400, custom_403, custom_404, custom_500
+
+
+
+# private function
+@lru_cache(maxsize=1)
+def _robots_txt_body():
+    return render_to_string("robots.txt").encode()
+
+
+def robots_txt(request):
+    """robots.txt is static: rendered on first hit, then served from the cached bytes."""
+    return HttpResponse(_robots_txt_body(), content_type="text/plain")
 
 
 urlpatterns = [
     path(settings.DJANGO_CUSTOM_ADMIN_URL, admin.site.urls),
     path('accounts/', include('accounts.urls', namespace='accounts')),
 
-    path('robots.txt', TemplateView.as_view(template_name="robots.txt", content_type="text/plain")),#can use NGINX instead
+    path('robots.txt', robots_txt),#can use NGINX instead
 
     path('', include('home.urls')),#can delete
 ]
@@ -37,13 +51,15 @@ if settings.DJANGO_BROWSER_RELOAD and settings.DEBUG:
 
 
 
-handler400 = 'accounts.views.custom_400'
-handler403 = 'accounts.views.custom_403'
-handler404 = 'accounts.views.custom_404'
-handler500 = 'accounts.views.custom_500'
-handler429 = 'accounts.views.custom_403'
+# direct references: a typo fails at boot, not during an incident
+handler400 = custom_400
+handler403 = custom_403
+handler404 = custom_404
+handler500 = custom_500
+handler429 = custom_403
 
-# Static & media for dev
+# Static & media for dev (imported and built only when DEBUG, production serves them from nginx)
 if settings.DEBUG:
+    from django.conf.urls.static import static
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
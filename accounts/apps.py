@@ -1,6 +1,17 @@
+import logging
+
 from django.apps import AppConfig
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from django.conf import settings
+
+        # startup banner: logged here because LOGGING is configured by now (not yet while settings.py imports)
+        logging.getLogger("a_django_starter.startup").info(
+            "Production: %s | DATABASE: %s | Hosts: %s | HMR: %s",
+            settings.DJANGO_IS_PRODUCTION, settings.DB_TYPE, settings.ALLOWED_HOSTS, settings.DJANGO_BROWSER_RELOAD,
+        )
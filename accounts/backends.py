@@ -6,9 +6,15 @@ from django.contrib.auth import get_user_model
 UserModel = get_user_model()
 
 class AuthByEmailBackend(ModelBackend):
+    # only the columns the login flow reads (password check, 2FA/email checks, tokens & emails)
+    LOGIN_FIELDS = (
+        'id', 'password', 'email', 'first_name', 'last_name', 'last_login',
+        'is_active', 'is_staff', 'is_email_verified', 'enabled_2fa', 'is_2fa_authenticated',
+    )
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         try:
-            user = UserModel.objects.get(email=username)
+            user = UserModel.objects.only(*self.LOGIN_FIELDS).get(email=username)
         except UserModel.DoesNotExist:
             return None
 
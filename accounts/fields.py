@@ -4,9 +4,15 @@ from django import forms
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from .widgets import KeyValueWidget, ColorPickerWidget
+from django.utils.translation import gettext_lazy as _
 import logging
 
 logger = logging.getLogger(__name__)
+
+# JSONKeyValueField messages, lazy so they translate per request language
+_E_INVALID_JSON = _("Invalid JSON format.")
+_E_NOT_OBJECT = _("Must be a JSON object (key-value pairs).")
+_E_NO_VALID_PAIR = _("At least one valid key-value pair is required.")
 # ? ----------------------------------------------------------------
 # ? end imports
 # ? ----------------------------------------------------------------
@@ -39,6 +45,17 @@ class HoneyPotField(forms.CharField):
 
 
 
+# private function
+def _has_valid_pair(value: dict) -> bool:
+    """True on the first non-blank key with a non-blank value, str() only for non-string values."""
+    for k, v in value.items():
+        if not k.strip():
+            continue
+        if (v if isinstance(v, str) else str(v)).strip():
+            return True
+    return False
+
+
 class JSONKeyValueField(forms.Field):
     """
     Description: i needed a way to add cleaning and validation logic, else can use KeyValueWidget + in-model cleaning
@@ -53,9 +70,9 @@ class JSONKeyValueField(forms.Field):
     def validate(self, value):
         super().validate(value)
         if not isinstance(value, dict):
-            raise ValidationError("Must be a JSON object (key-value pairs).")
-        if not any(k.strip() and str(v).strip() for k, v in value.items()):
-            raise ValidationError("At least one valid key-value pair is required.")
+            raise ValidationError(_E_NOT_OBJECT, code='not_object')
+        if not _has_valid_pair(value):
+            raise ValidationError(_E_NO_VALID_PAIR, code='no_valid_pair')
 
     def to_python(self, value):
         if value is None:
@@ -64,15 +81,18 @@ class JSONKeyValueField(forms.Field):
             data = value
         else:
             try:
-                data = json.loads(value)
+                data = json.loads(value)  # stdlib: orjson would turn >64-bit ints into floats
             except json.JSONDecodeError:
-                raise ValidationError("Invalid JSON format.")
+                raise ValidationError(_E_INVALID_JSON, code='invalid_json')
+        # single pass: key stripped once, str() only ever needed for string values
         cleaned = {}
         for k, v in data.items():
-            if not k.strip():
+            k = k.strip()
+            if not k or v is None or v == []:
+                continue
+            if isinstance(v, str) and not v.strip():
                 continue
-            if v not in (None, "", []) and str(v).strip():
-                cleaned[k.strip()] = v
+            cleaned[k] = v
         return cleaned
 
 
@@ -0,0 +1,85 @@
+import re
+
+from django.test import SimpleTestCase
+
+from .utils.safety_utils import contains_malicious_code
+
+
+# the per-pattern implementation contains_malicious_code replaced (chunk5-11), kept as the reference
+_LEGACY_PATTERNS = (
+    r"<script.*?>.*?</script>",
+    r"onerror=",
+    r"onload=",
+    r"javascript:",
+    r"&lt;script&gt;",
+)
+
+
+def _legacy_contains_malicious_code(text):
+    return any(re.search(pattern, text, re.IGNORECASE) for pattern in _LEGACY_PATTERNS)
+
+
+class ContainsMaliciousCodeTests(SimpleTestCase):
+
+    def test_each_marker_is_detected(self):
+        samples = {
+            "script tag": 'hello <script type="text/javascript">alert(1)</script> world',
+            "onerror": '<img src=x onerror=alert(1)>',
+            "onload": '<body onload=steal()>',
+            "javascript scheme": '<a href="javascript:alert(1)">click</a>',
+            "escaped script": "&lt;script&gt;alert(1)&lt;/script&gt;",
+        }
+        for name, text in samples.items():
+            with self.subTest(marker=name):
+                self.assertTrue(contains_malicious_code(text))
+
+    def test_markers_are_case_insensitive(self):
+        for text in (
+            "<SCRIPT>alert(1)</SCRIPT>",
+            "<ScRiPt src=x></sCrIpT>",
+            "<img ONERROR=alert(1)>",
+            "<body OnLoad=x()>",
+            "JAVASCRIPT:alert(1)",
+            "&LT;SCRIPT&GT;",
+        ):
+            with self.subTest(text=text):
+                self.assertTrue(contains_malicious_code(text))
+
+    def test_clean_text_is_not_flagged(self):
+        for text in (
+            "",
+            "Bonjour, je voudrais un devis pour 3 articles.",
+            "the script was great, load it on error",
+            "onerror = handled later",  # space before '=' never matched
+            "<scrip>not a tag</scrip>",
+            "<script>never closed",
+        ):
+            with self.subTest(text=text):
+                self.assertFalse(contains_malicious_code(text))
+
+    def test_matches_legacy_patterns_on_single_line_inputs(self):
+        corpus = (
+            "",
+            "plain text",
+            "<script>x</script>",
+            "<script src='a.js'></script> tail",
+            "<img src=x onerror=alert(1)>",
+            "<body onload=init()>",
+            "href=javascript:void(0)",
+            "&lt;script&gt;",
+            "<SCRIPT>upper</SCRIPT>",
+            "onerror = spaced",
+            "<script>unterminated",
+            "javascript : spaced",
+        )
+        for text in corpus:
+            with self.subTest(text=text):
+                self.assertEqual(contains_malicious_code(text), _legacy_contains_malicious_code(text))
+
+    def test_multiline_script_block_is_detected(self):
+        # re.DOTALL (chunk5-11): a <script> block spanning lines is flagged, the legacy patterns missed it
+        text = "<script>\nfetch('/steal?c=' + document.cookie)\n</script>"
+        self.assertTrue(contains_malicious_code(text))
+        self.assertFalse(_legacy_contains_malicious_code(text))
+
+        self.assertTrue(contains_malicious_code('<script\ntype="text/javascript">\nalert(1)</script>'))
@@ -15,7 +15,7 @@ app_name = "accounts"
 urlpatterns = [
     path('set-language/', views.set_language, name='set_language'),
 
-    path('verify_email/<str:uidb64>/<str:token>/<str:signed_ts>/', views.verify_email, name='verify_email'),
+    path('verify_email/<str:token>/', views.verify_email, name='verify_email'),
     path('verify_2fa/', views.verify_2fa, name='verify_2fa'),
     path('ajax/toggle-2fa-status/', views.toggle_2fa_status_ajax, name='toggle_2fa_ajax'),
     path('login/', views.login_view, name='login'),
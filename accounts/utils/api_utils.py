@@ -1,22 +1,81 @@
 
+import hashlib
 import ipaddress
-import uuid
+import secrets
+import logging
+import time
+from functools import lru_cache
+
 from django.core.cache import cache
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.shortcuts import redirect
 from django.conf import settings
 from django.http import HttpRequest
 
+logger = logging.getLogger(__name__)
+
 # * ==========================================================
 # * URLS and api
 # * ==========================================================
 
+# Sliding-window limiter, runs atomically on the Redis server in one round-trip.
+# KEYS[1]: zset key, ARGV: now (ms), window (ms), limit, unique member
+_SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return 1
+"""
+_sliding_window_script = None
+
+# Redirect hosts frozen once at import (see get_redirect_allowed_hosts): url_has_allowed_host_and_scheme
+# matches hosts exactly, so wildcard entries ('*', '.example.com') can't be listed and need the request host
+_EXACT_ALLOWED_HOSTS = frozenset(h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.'))
+_ALLOWED_HOSTS_NEED_REQUEST_HOST = not settings.ALLOWED_HOSTS or any(h == '*' or h.startswith('.') for h in settings.ALLOWED_HOSTS)
+
+
+# private function
+def _get_sliding_window_script():
+    """
+    Registers the Lua script on the django-redis client once.
+    Needs django-redis (optional dependency) as the "default" cache, i.e. 'django_redis.cache.RedisCache'.
+    Returns False otherwise, Django's built-in django.core.cache.backends.redis.RedisCache included
+    (get_redis_connection raises NotImplementedError for it): request_rate_limit then uses its fixed window.
+    """
+    global _sliding_window_script
+    if _sliding_window_script is None:
+        try:
+            from django_redis import get_redis_connection
+            _sliding_window_script = get_redis_connection("default").register_script(_SLIDING_WINDOW_LUA)
+        except (ImportError, NotImplementedError):
+            _sliding_window_script = False
+    return _sliding_window_script
+
+
+# private function
+def _rate_limit_ip(request) -> str:
+    """
+    Client IP for rate limiting: X-Real-IP (set by our nginx from $remote_addr) or REMOTE_ADDR.
+    Never X-Forwarded-For, its first entry is whatever the client sent (fresh bucket per request).
+    """
+    return request.META.get('HTTP_X_REAL_IP') or request.META.get('REMOTE_ADDR') or ''
+
 
 def request_rate_limit(
     request, key: str, limit: int = 5, time_window: int = 60
     ) -> bool:
     """
     Limits the number of requests per user or session for a given key within a time window.
+    Uses a Redis sliding window (Lua script, one round-trip) when django-redis
+    ('django_redis.cache.RedisCache') is the configured cache, else a fixed window counter.
+    Note: the cache backend must support atomic ``incr`` shared by all workers (Redis, Memcached),
+    LocMem/DB caches silently break multi-worker rate limiting.
+    Anonymous visitors without a stored session are bucketed by the proxy-set IP (X-Real-IP / REMOTE_ADDR).
 
     Args:
         request: Django request object.
@@ -30,34 +89,53 @@ def request_rate_limit(
     if request.user.is_authenticated:
         identifier = str(request.user.pk)
     else:
-        # Ensure session exists (creates one if using cookie-based sessions)
+        # Read-only: never force a session write just to get a key, fall back to the proxy-seen IP.
+        # session_key is the raw cookie: only trust it if the store knows it (a forged cookie per request
+        # would otherwise get a fresh bucket every time)
         session_key = request.session.session_key
-        if not session_key:
-            try:
-                request.session.save()
-            except Exception:
-                # Fallback to a per-process identifier if sessions cannot be created
-                session_key = None
-        identifier = session_key or uuid.uuid4().hex
-
+        if session_key and request.session.exists(session_key):
+            identifier = session_key
+        else:
+            identifier = _rate_limit_ip(request)
+        if not identifier:
+            # ! no session and no IP: one shared bucket would let any caller lock everyone out, fail closed
+            logger.warning("request_rate_limit(%s): no session key nor client IP, request refused", key)
+            return False
+
+    # Hashed so the cache key length stays bounded whatever the identifier is
+    identifier = hashlib.blake2b(identifier.encode(), digest_size=16).hexdigest()
     cache_key = f"rate_limit:{key}:{identifier}"
-    count = cache.get(cache_key, 0)
 
-    if count >= limit:
-        return False
+    # Exact sliding window when django-redis is available (no 2x burst at fixed-window edges)
+    script = _get_sliding_window_script()
+    if script:
+        now_ms = int(time.time() * 1000)
+        return bool(script(keys=[cache_key], args=[now_ms, time_window * 1000, limit, f"{now_ms}:{secrets.token_hex(4)}"]))
 
-    if count == 0:
-        # First request: set with expiration
-        cache.set(cache_key, 1, timeout=time_window)
-    else:
-        # Increment without resetting TTL
-        cache.incr(cache_key)
+    # Fixed window fallback: atomic server-side INCR, no get-then-set race between workers
+    try:
+        count = cache.incr(cache_key)  # keeps the TTL set by the first request
+    except ValueError:
+        # First request of the window: add() only succeeds for one concurrent caller
+        added = cache.add(cache_key, 1, timeout=time_window)
+        count = 1 if added else cache.incr(cache_key)
 
-    return True
+    return count <= limit
 
 
 
 
+def get_redirect_allowed_hosts(request) -> frozenset:
+    """
+    Hosts a redirect may point to: the exact settings.ALLOWED_HOSTS entries (frozen at import),
+    plus the request's own (already ALLOWED_HOSTS-validated) host when wildcards or an empty list make
+    the exact set incomplete. Pass it to url_has_allowed_host_and_scheme (None there means "no host at all").
+    """
+    if _ALLOWED_HOSTS_NEED_REQUEST_HOST:
+        return _EXACT_ALLOWED_HOSTS | {request.get_host()}
+    return _EXACT_ALLOWED_HOSTS
+
+
 def safe_redirect(request, url, fallback_url="/"):
     """
     Redirects to a URL only if it's considered safe, otherwise falls back.
@@ -68,7 +146,7 @@ def safe_redirect(request, url, fallback_url="/"):
     """
     if url and url_has_allowed_host_and_scheme(
         url=url,
-        allowed_hosts=settings.ALLOWED_HOSTS or None,  # None falls back to settings
+        allowed_hosts=get_redirect_allowed_hosts(request),
         require_https=request.is_secure(),
     ):
         return redirect(url)
@@ -80,40 +158,45 @@ def get_request_ip(request: HttpRequest) -> str:
     """
     Return the real client IP address, even behind a reverse proxy.
     """
-    # Common headers set by proxies (order matters)
-    headers_to_check = [
-        'HTTP_X_FORWARDED_FOR',  # can be a list: client, proxy1, proxy2
-        'HTTP_X_REAL_IP',        # often set by Nginx
-        'REMOTE_ADDR',           # direct connection fallback
-    ]
-
-    for header in headers_to_check:
-        ip = request.META.get(header)
-        if ip:
-            # If X-Forwarded-For has multiple IPs, take the first (the client)
-            if header == 'HTTP_X_FORWARDED_FOR':
-                ip = ip.split(',')[0].strip()
-            return ip
+    # X-Forwarded-For can be a list: client, proxy1, proxy2 -> take the first (the client)
+    xff = request.META.get('HTTP_X_FORWARDED_FOR')
+    if xff:
+        comma = xff.find(',')  # no list allocation in the common single-IP case
+        return xff[:comma].strip() if comma != -1 else xff.strip()
 
-    return ''
+    # X-Real-IP is often set by Nginx, REMOTE_ADDR is the direct connection fallback
+    return request.META.get('HTTP_X_REAL_IP') or request.META.get('REMOTE_ADDR') or ''
 
 
-def is_ipv4_address(ip: str) -> bool:
+# private function
+@lru_cache(maxsize=4096)
+def _parse_ip(ip: str):
+    """Parses an IP once, repeat lookups (same clients over and over) hit the LRU. None if invalid."""
     try:
-        return isinstance(ipaddress.ip_address(ip), ipaddress.IPv4Address)
+        return ipaddress.ip_address(ip)
     except ValueError:
-        return False
+        return None
+
+
+def is_ipv4_address(ip: str) -> bool:
+    return isinstance(_parse_ip(ip), ipaddress.IPv4Address)
 
 
 def is_ipv6_address(ip: str) -> bool:
-    try:
-        return isinstance(ipaddress.ip_address(ip), ipaddress.IPv6Address)
-    except ValueError:
-        return False
+    return isinstance(_parse_ip(ip), ipaddress.IPv6Address)
 
 
 def is_public_ip(ip: str) -> bool:
-    try:
-        return ipaddress.ip_address(ip).is_global
-    except ValueError:
-        return False
\ No newline at end of file
+    addr = _parse_ip(ip)
+    return addr is not None and addr.is_global
+
+
+def classify_ip(ip: str) -> tuple[bool, bool, bool]:
+    """
+    Classifies an IP with a single parse: returns (is_ipv4, is_ipv6, is_public).
+    Prefer it over calling the three helpers above in sequence.
+    """
+    addr = _parse_ip(ip)
+    if addr is None:
+        return (False, False, False)
+    return (isinstance(addr, ipaddress.IPv4Address), isinstance(addr, ipaddress.IPv6Address), addr.is_global)
@@ -1,6 +1,6 @@
 
 import os
-import uuid
+import secrets
 
 from django.db import IntegrityError
 from django.db.models.fields.files import FieldFile
@@ -8,27 +8,44 @@ from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.utils.timezone import now
 
-def model_to_full_dict(instance):
+def model_to_full_dict(instance, fields=None):
     """
-    Returns a dict of all fields (including FileFields) for a model instance.
+    Returns a dict of all concrete fields (including FileFields) for a model instance.
+    Uses the cached `_meta.concrete_fields` tuple, reverse relations and m2m are not included.
     """
     data = {}
-    for field in instance._meta.get_fields():
-        if hasattr(instance, field.name):
-            value = getattr(instance, field.name)
-            if isinstance(value, FieldFile):
-                data[field.name] = value.url if value else None
-            else:
-                data[field.name] = value
+    for field in fields or instance._meta.concrete_fields:
+        value = getattr(instance, field.name)
+        if isinstance(value, FieldFile):
+            data[field.name] = value.url if value else None
+        else:
+            data[field.name] = value
     return data
 
 
+def model_to_full_dict_many(queryset):
+    """
+    Bulk version of model_to_full_dict, the field list is resolved once for the whole queryset.
+    Forward FKs / one-to-ones are select_related() (one JOINed query, not one query per FK per row).
+    """
+    fields = queryset.model._meta.concrete_fields
+    relations = [field.name for field in fields if field.is_relation]
+    if relations:
+        queryset = queryset.select_related(*relations)
+    return [model_to_full_dict(instance, fields) for instance in queryset]
+
+
 
 
 def get_or_create_atomic(model, defaults=None, **kwargs):
     """
     Atomic get_or_create to avoid race conditions.
+    Tries a plain get() first so the common "already exists" path skips the savepoint.
     """
+    try:
+        return model.objects.get(**kwargs), False
+    except model.DoesNotExist:
+        pass
     try:
         with transaction.atomic():
             return model.objects.get_or_create(defaults=defaults, **kwargs)
@@ -63,13 +80,13 @@ class GenerateUniqueFileName:
     for uploaded files, helping prevent filename conflicts and path length issues.
 
     Features:
-    - Generates a short, UUID-based filename to avoid issues like `SuspiciousFileOperation`
+    - Generates a short, random 32-hex-char filename to avoid issues like `SuspiciousFileOperation`
     caused by overly long file names or unintended file overwrites.
     - Organizes uploaded files into subdirectories by year.
     - Preserves the original file extension.
 
     File Path Format:
-        ``<base_folder>/<year>/<uuid>.<ext>``
+        ``<base_folder>/<year>/<32 hex chars>.<ext>``
 
     Example:
         ``
@@ -85,12 +102,18 @@ class GenerateUniqueFileName:
 
     def __init__(self, base_folder):
         self.base_folder = base_folder
+        # ("<year>", "<base_folder>/<year>") only changes once a year, rebuilt on rollover.
+        # one tuple, swapped and read in a single step: no thread can see a new year with an old prefix
+        self._year_prefix = (None, None)
 
     def __call__(self, instance, filename):
         ext = os.path.splitext(filename)[1]
-        unique_name = f"{uuid.uuid4().hex}{ext}"
         year = now().year
-        return os.path.join(self.base_folder, str(year), unique_name)
+        cached_year, prefix = self._year_prefix
+        if year != cached_year:
+            prefix = f"{self.base_folder}/{year}"
+            self._year_prefix = (year, prefix)
+        return f"{prefix}/{secrets.token_hex(16)}{ext}"  # storages expect POSIX paths
 
     def deconstruct(self):
         """
@@ -1,8 +1,11 @@
+import asyncio
+import random
 import time
 import logging
 from functools import wraps
 import re
 
+from asgiref.sync import iscoroutinefunction
 from django.shortcuts import redirect
 from django.core.exceptions import PermissionDenied
 from django.http import Http404, HttpResponseBadRequest, HttpResponseForbidden
@@ -87,31 +90,70 @@ def atomic_transaction(func=None):
     return _decorator(func)
 
 
-def retry_on_exception(times: int = 3, exceptions=(Exception,), delay_seconds: float = 0.5):
+def retry_on_exception(
+    times: int = 3,
+    exceptions=(Exception,),
+    delay_seconds: float = 0.5,
+    max_backoff: float = 10.0,
+    max_total_seconds: float = 30.0,
+):
     """
-    Decorator to retry a function call on transient exceptions with linear backoff.
+    Decorator to retry a function call on transient exceptions with exponential backoff and jitter.
 
     Args:
         times (int): Maximum number of attempts (default: 3).
         exceptions (tuple): Exception classes to catch (default: (Exception,)).
         delay_seconds (float): Base delay between retries in seconds.
-            The actual wait time increases linearly: delay_seconds * attempt.
+            The backoff doubles after each attempt and the actual wait is a random
+            value in [0, backoff] so concurrent clients don't retry in lockstep.
+        max_backoff (float): Upper bound of the backoff in seconds (default: 10).
+        max_total_seconds (float): Deadline for all attempts together, once reached the
+            last exception is re-raised even if attempts remain (default: 30).
+
+    Works on both sync and async functions (async ones sleep with asyncio.sleep).
 
     Example:
         @retry_on_exception(times=3, exceptions=(IOError,))
         def some_view():
             ...
     """
+    def _next_sleep(attempt, backoff, deadline):
+        """Returns the jittered wait before the next attempt, or None to give up."""
+        remaining = deadline - time.monotonic()
+        if attempt == times or remaining <= 0:
+            return None
+        return random.uniform(0, min(backoff, remaining))
+
     def decorator(func):
+        if iscoroutinefunction(func):  # asgiref's, as Django uses (asyncio's is deprecated in 3.14)
+            @wraps(func)
+            async def async_wrapped(*args, **kwargs):
+                deadline = time.monotonic() + max_total_seconds
+                backoff = delay_seconds
+                for attempt in range(1, times + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except exceptions:
+                        sleep = _next_sleep(attempt, backoff, deadline)
+                        if sleep is None:
+                            raise  # re-raise the last exception
+                        await asyncio.sleep(sleep)
+                        backoff = min(backoff * 2, max_backoff)
+            return async_wrapped
+
         @wraps(func)
         def wrapped(*args, **kwargs):
+            deadline = time.monotonic() + max_total_seconds
+            backoff = delay_seconds
             for attempt in range(1, times + 1):
                 try:
                     return func(*args, **kwargs)
                 except exceptions:
-                    if attempt == times:
+                    sleep = _next_sleep(attempt, backoff, deadline)
+                    if sleep is None:
                         raise  # re-raise the last exception
-                    time.sleep(delay_seconds * attempt)
+                    time.sleep(sleep)
+                    backoff = min(backoff * 2, max_backoff)
         return wrapped
     return decorator
 
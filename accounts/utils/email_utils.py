@@ -1,46 +1,44 @@
 
-import time, logging, secrets
+import hashlib, logging, secrets
 from typing import Set
 
 from django.conf import settings
-from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sites.shortcuts import get_current_site
 
 
 
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.core.mail import send_mail, EmailMultiAlternatives, get_connection
 from django.core.signing import TimestampSigner
 
 
 
 from django.template.loader import render_to_string
 from django.urls import reverse
-from django.utils.encoding import force_bytes
-from django.utils.html import strip_tags
-from django.utils.http import urlsafe_base64_encode
+from django.utils.html import escape, strip_tags
 
 # Logger
 logger = logging.getLogger(__name__)
 
 # ?-----------------------------end imports-------------------
 
+# Email verification links carry a signed {"uid", "email"} object, valid for 1 day
+EMAIL_VERIFICATION_SIGNER = TimestampSigner(salt="accounts.verify_email")
+EMAIL_VERIFICATION_MAX_AGE = 24 * 3600
 
+# 2FA state is ONE signed session value {"uid", "code_hash"}, its timestamp drives expiry (unsign max_age)
+TWO_FA_SESSION_KEY = "2fa"
+TWO_FA_SIGNER = TimestampSigner(salt="accounts.2fa")
+TWO_FA_MAX_AGE = 15 * 60  # 15 minutes
 
-def send_verification_email(request, user):
-    # Generate the default token
-    token = default_token_generator.make_token(user)
 
-    # Get the current timestamp (seconds since the epoch)
-    timestamp = int(time.time())
-    signer = TimestampSigner()  # cleaner than Signer in this use case
-    signed_timestamp = signer.sign(str(timestamp))
 
-    # Encode user ID and timestamp
-    uid = urlsafe_base64_encode(force_bytes(user.pk))
+def send_verification_email(request, user):
+    # Signed user id + email, the signature timestamp is the expiry reference
+    token = EMAIL_VERIFICATION_SIGNER.sign_object({"uid": user.pk, "email": user.email})
 
-    # Prepare the URL with the timestamp included
+    # Prepare the URL with the token
     domain = get_current_site(request).domain
-    link = f"https://{domain}{reverse('accounts:verify_email', kwargs={'uidb64': uid, 'token': token, 'signed_ts': signed_timestamp})}"
+    link = f"https://{domain}{reverse('accounts:verify_email', kwargs={'token': token})}"
 
     subject = "Activer votre compte"
     html_message = render_to_string(
@@ -71,13 +69,14 @@ def send_verification_email(request, user):
 
 def send_2fa_code(request, user, subject="Your 2FA Code", email_template=None):
     """
-    Generates a 4-digit 2FA code, stores session info, and sends it to the user's email.
+    Generates a 4-digit 2FA code, stores a signed token (user id + code hash) in the session,
+    and sends it to the user's email.
     """
 
-    code = str(secrets.randbelow(9000)+1000)
-    request.session["2fa_user_id"] = user.id
-    request.session["2fa_code"] = code
-    request.session["2fa_created_at"] = int(time.time())
+    code = f"{1000 + secrets.randbelow(9000):04d}"  # CSPRNG, never random.randint
+    request.session[TWO_FA_SESSION_KEY] = TWO_FA_SIGNER.sign_object(
+        {"uid": user.id, "code_hash": hashlib.sha256(code.encode()).hexdigest()}
+    )
 
     # If no template is provided, use a minimal default HTML body
     if email_template:
@@ -157,6 +156,72 @@ class EmailMATemplate:
         return email
 
 
+def send_bulk_template_email(
+    subject: str,
+    template_path: str,
+    recipients,
+    placeholders: list,
+    context: dict = None,
+    from_email: str = None,
+    connection=None,
+):
+    """
+    Bulk variant of EmailMATemplate: renders the template (and its plain text fallback) ONCE
+    with placeholder tokens, then only swaps the per-recipient values with str.replace.
+
+    - recipients: iterable of ``(email, {placeholder: value})`` pairs
+    - placeholders: context keys that differ per recipient, they must be used as plain
+      ``{{ key }}`` in the template (no filters, since the template only sees a token)
+    - connection: optional open backend connection, else one is opened for the batch and closed after
+    - a failing recipient is logged and skipped, returns the number of emails sent
+    - Usage:
+
+        send_bulk_template_email(
+            subject="Nouvel arrivage pour vous",
+            template_path="emails/new_arrival_email.html",
+            recipients=((u.email, {"user_name": u.get_full_name()}) for u in users),
+            placeholders=["user_name"],
+        )
+    """
+    tokens = {key: f"__BULK_{key.upper()}__" for key in placeholders}
+    html_shell = render_to_string(template_path, {**(context or {}), **tokens})
+    text_shell = strip_tags(html_shell)
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+
+    # one SMTP connection (one handshake) for the whole batch, only closed here if opened here
+    owns_connection = connection is None
+    connection = connection or get_connection()
+    if owns_connection:
+        connection.open()
+
+    sent = 0
+    try:
+        for to, values in recipients:
+            html_body, text_body = html_shell, text_shell
+            for key, token in tokens.items():
+                value = str(values.get(key, ""))
+                html_body = html_body.replace(token, escape(value))
+                text_body = text_body.replace(token, value)
+
+            email = EmailMultiAlternatives(
+                subject=subject,
+                body=text_body,
+                from_email=from_email,
+                to=[to],
+                connection=connection,
+            )
+            email.attach_alternative(html_body, "text/html")
+            try:
+                sent += email.send()
+            except Exception:
+                # one bad recipient must not stop the batch
+                logger.exception('Failed to send bulk email to %s', to)
+    finally:
+        if owns_connection:
+            connection.close()
+    return sent
+
+
 def email_send_safe(subject: str, html_message: str, to: list, from_email: str = None, fail_silently: bool = True, connection=None):
     """Wrapper around EmailMultiAlternatives that logs failures and optionally re-raises.
 
@@ -190,10 +255,9 @@ def email_is_allowed(self, email: str, allowed_domains: Set[str]) -> bool:
     Returns:
         bool: True if the domain is allowed, False otherwise.
     """
-    # Extract domain part after '@'
-    parts = email.split("@")
-    if len(parts) != 2:  # Invalid email format
+    # Extract domain part after the last '@' (fixed-size tuple, no list allocation)
+    local, sep, domain = email.rpartition("@")
+    if not sep or "@" in local:  # Invalid email format
         return False
 
-    domain = parts[1].lower()  # Case-insensitive comparison
-    return domain in allowed_domains
\ No newline at end of file
+    return domain.lower() in allowed_domains  # Case-insensitive comparison
\ No newline at end of file
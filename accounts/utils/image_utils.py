@@ -1,6 +1,8 @@
 import logging
+from typing import TYPE_CHECKING
 
-from PIL import Image, ExifTags
+if TYPE_CHECKING:
+    from PIL import Image  # PIL is imported lazily inside the functions (cold-start RSS)
 
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.core.files import File
@@ -11,8 +13,10 @@ logger = logging.getLogger(__name__)
 
 
 # private function
-def _fix_exif_orientation(img: Image.Image) -> Image.Image:
+def _fix_exif_orientation(img: "Image.Image") -> "Image.Image":
     """Normalize orientation using EXIF metadata."""
+    from PIL import ExifTags
+
     try:
         for orientation in ExifTags.TAGS.keys():
             if ExifTags.TAGS[orientation] == 'Orientation':
@@ -97,6 +101,8 @@ def validate_image_aspectratio(
     if not image_field:
         return
 
+    from PIL import Image
+
     try:
         with Image.open(image_field) as img:
             img = _fix_exif_orientation(img)
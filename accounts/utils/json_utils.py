@@ -0,0 +1,43 @@
+import json
+
+try:
+    import orjson  # C/Rust JSON codec
+except ImportError:  # optional dependency, fall back to stdlib
+    orjson = None
+
+# ?-----------------------------end imports-------------------
+
+# * ==========================================================
+# * JSON Utilities (orjson when installed, stdlib otherwise)
+# * ==========================================================
+# ! orjson decodes integers above 64 bits as floats and rejects NaN/Infinity:
+# ! decode with stdlib json.loads whenever the parsed value is kept or shown to a user.
+
+
+# private function
+def _reject_constant(name):
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def fast_json_loads(raw):
+    """
+    Parses `raw` with orjson when installed. Only for validation / throwaway parses,
+    never keep the result (see the precision note above).
+    Strict JSON with both backends: NaN / Infinity / -Infinity raise ValueError.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw, parse_constant=_reject_constant)
+
+
+def json_dumps(obj) -> str:
+    """
+    Compact JSON string, serialized by orjson when installed.
+    Falls back to stdlib for what orjson refuses (e.g. integers above 64 bits).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+            pass
+    return json.dumps(obj)
@@ -7,6 +7,6 @@ def normalize_dict_reader(reader):
             price = row.get('price')
     """
     reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
-    for row in reader:
-        yield {k.strip().lower(): v for k, v in row.items()}
+    # DictReader builds each row from fieldnames, so rows are already keyed by the normalized names
+    yield from reader
 
@@ -2,21 +2,61 @@ import json
 import re
 import os
 from typing import Set
-import unicodedata
 import string
 import logging
+from functools import lru_cache
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 
-from PIL import Image
+try:
+    import hyperscan  # JIT'd multi-pattern matcher, only used by SpamDetector.scan_batch
+except ImportError:  # optional dependency, fall back to re
+    hyperscan = None
 
 from django.core.files.uploadedfile import UploadedFile
 
+from .json_utils import fast_json_loads
+
 # Logger
 logger = logging.getLogger(__name__)
 
 # ?-----------------------------end imports-------------------
 
+# Compiled once at import, shared by every SpamDetector instance
+_EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b", re.IGNORECASE)
+_PHONE_RE = re.compile(r"(?:\+\d{1,3}[-.\s]?)?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}")  # non-capturing, fixed structure
+
+_SUSPICIOUS_UNICODE_RE = re.compile(r"[\u0400-\u04FF\u0600-\u06FF]")  # Cyrillic / Arabic blocks
+
+# str.translate table deleting zero-width space / non-joiner / joiner
+_ZERO_WIDTH_TABLE = dict.fromkeys((0x200B, 0x200C, 0x200D))
+
+# One pass over the text for every XSS marker (DOTALL: script tags split over lines are caught too)
+_MALICIOUS_CODE_RE = re.compile(
+    r"<script.*?>.*?</script>|onerror=|onload=|javascript:|&lt;script&gt;",
+    re.IGNORECASE | re.DOTALL,
+)
 
+# File signatures checked by is_safe_upload before any full decode
+_UPLOAD_MAGIC_BYTES = {
+    ".jpg": b"\xff\xd8\xff",
+    ".jpeg": b"\xff\xd8\xff",
+    ".png": b"\x89PNG\r\n\x1a\n",
+    ".pdf": b"%PDF-",
+}
+
+# Valid JSON documents can only start with one of these (after whitespace)
+_JSON_FIRST_CHARS = frozenset('{["tfn-0123456789')
+
+
+
+
+# private function
+@lru_cache(maxsize=64)
+def _decimal_bounds(max_digits: int, decimal_places: int):
+    """Max allowed value (e.g., for 10,3 -> 9999999.999) and quantizer, built once per precision."""
+    int_part = '9' * (max_digits - decimal_places)
+    frac_part = '9' * decimal_places
+    return Decimal(f"{int_part}.{frac_part}"), Decimal(f"1e-{decimal_places}")
 
 
 def safe_to_decimal(value, max_digits=10, decimal_places=3) -> Decimal:
@@ -34,16 +74,16 @@ def safe_to_decimal(value, max_digits=10, decimal_places=3) -> Decimal:
     if max_digits <= decimal_places:
         raise ValueError("max_digits must be greater than decimal_places")
 
-    # Convert safely to Decimal
-    try:
-        value = Decimal(str(value))
-    except (ValueError, TypeError, InvalidOperation):
-        value = Decimal('0')
+    # Convert safely to Decimal (no str round-trip for values that are already exact)
+    if isinstance(value, Decimal) or type(value) is int:
+        value = Decimal(value)
+    else:
+        try:
+            value = Decimal(str(value))
+        except (ValueError, TypeError, InvalidOperation):
+            value = Decimal('0')
 
-    # Compute max allowed value (e.g., for 10,3 -> 9999999.999)
-    int_part = '9' * (max_digits - decimal_places)
-    frac_part = '9' * decimal_places
-    max_value = Decimal(f"{int_part}.{frac_part}")
+    max_value, quantizer = _decimal_bounds(max_digits, decimal_places)
 
     # Clip to range [0, max_value]
     if value > max_value:
@@ -53,7 +93,6 @@ def safe_to_decimal(value, max_digits=10, decimal_places=3) -> Decimal:
 
     # Quantize using explicit exponent form (preferred)
     try:
-        quantizer = Decimal(f"1e-{decimal_places}")
         value = value.quantize(quantizer, rounding=ROUND_HALF_UP)
     except (InvalidOperation, ValueError):
         # Fallback to max value if quantization fails
@@ -74,6 +113,7 @@ def safe_json_parse(data: str, default=None):
         Returns:
             dict | list | Any: Parsed object or default.
     """
+    # stdlib on purpose: the value goes back to the caller, orjson would turn >64-bit ints into floats
     try:
         return json.loads(data)
     except (ValueError, TypeError):
@@ -81,10 +121,14 @@ def safe_json_parse(data: str, default=None):
 
 
 def is_valid_json(json_str: str) -> bool:
+    # strict JSON: NaN / Infinity literals are rejected, with or without orjson (see fast_json_loads)
+    # cheap reject before paying for a parse (and its exception) on obvious garbage
+    if not isinstance(json_str, str) or json_str.lstrip(" \t\r\n")[:1] not in _JSON_FIRST_CHARS:
+        return False
     try:
-        json.loads(json_str)
+        fast_json_loads(json_str)  # value discarded, orjson is safe here
         return True
-    except json.JSONDecodeError:
+    except (ValueError, TypeError):  # orjson.JSONDecodeError subclasses ValueError
         return False
 
 
@@ -116,15 +160,24 @@ def is_safe_upload(file: UploadedFile, max_size_mb: int = 10, allowed_types=None
     if file.size > max_size_mb * 1024 * 1024:
         return False
 
-    # Deeper content inspection for images
-    if allowed_types[ext].startswith("image/"):
-        try:
-            img = Image.open(file)
-            img.verify()  # ensures file is an actual image
-        except Exception:
+    try:
+        # Cheap header sniff first: rejects mismatching payloads after a few bytes
+        magic = _UPLOAD_MAGIC_BYTES.get(ext)
+        if magic and not file.read(len(magic)).startswith(magic):
             return False
-        finally:
-            file.seek(0)  # reset file pointer for Django’s next use
+
+        # Deeper content inspection for images
+        if allowed_types[ext].startswith("image/"):
+            from PIL import Image  # lazy: only pay for PIL when an image is actually uploaded
+
+            file.seek(0)
+            try:
+                img = Image.open(file)
+                img.verify()  # ensures file is an actual image
+            except Exception:
+                return False
+    finally:
+        file.seek(0)  # reset file pointer for Django’s next use
 
     return True
 
@@ -135,14 +188,21 @@ def contains_malicious_code(text: str) -> bool:
     Checks for suspicious HTML/JS patterns.
     alternatively use bleach exp: sanitized = bleach.clean(text, tags=[], attributes={}, strip=True)
     """
-    patterns = [
-        r"<script.*?>.*?</script>",
-        r"onerror=",
-        r"onload=",
-        r"javascript:",
-        r"&lt;script&gt;",
-    ]
-    return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+    return bool(_MALICIOUS_CODE_RE.search(text))
+
+
+
+# private function
+@lru_cache(maxsize=64)
+def _keywords_pattern(keywords: frozenset, word_boundary: bool = True):
+    """
+    Compiles a keyword set into ONE case-insensitive alternation (longest first), cached per set,
+    so a message is scanned once instead of once per keyword. None for an empty set.
+    """
+    if not keywords:
+        return None
+    alternation = "|".join(map(re.escape, sorted(keywords, key=len, reverse=True)))
+    return re.compile(rf"\b(?:{alternation})\b" if word_boundary else alternation, re.IGNORECASE)
 
 
 
@@ -152,6 +212,24 @@ class SpamDetector:
     Uses regex heuristics for common spam, profanity, and phishing patterns.
     """
 
+    # --- Patterns and heuristics (compiled once at import, shared by all instances) ---
+    allowed_chars_pattern = re.compile(
+        rf"^[{re.escape(string.ascii_letters + string.digits + string.punctuation + string.whitespace)}À-ÿ]+$"
+    )
+    url_pattern = re.compile(r"(?:https?://|www\.|ftp://)[^\s/$.?#]+\.[^\s]*", re.IGNORECASE)
+    gibberish_pattern = re.compile(
+        r"(?:\b(?=\w*[A-Z])(?=\w*[a-z])[A-Za-z]{4,}\b[\s]*){3,}"
+        r"|\b\w*\d+\w*\b|[A-Za-z]{15,}|(?:[^a-zA-Z0-9\s]|_){3,}"
+    )
+    emoji_pattern = re.compile(r"[\U0001F300-\U0001FAD6\U0001FAE0-\U0001FAFF]")
+
+    RUN_PUNCTUATION = frozenset("!?.")
+    NON_UPPERCASE_ASCII = bytes(i for i in range(256) if not 65 <= i <= 90)  # bytes.translate delete table
+
+    # Match ids reported by scan_batch(), spam keyword i is reported as SCAN_KEYWORD_BASE + i
+    SCAN_URL, SCAN_GIBBERISH, SCAN_EMAIL, SCAN_PHONE = range(4)
+    SCAN_KEYWORD_BASE = 100
+
     def __init__(self, log_level=logging.WARNING):
         # --- Logging setup ---
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -164,74 +242,82 @@ class SpamDetector:
             self.logger.addHandler(handler)
         self.logger.setLevel(log_level)
 
-        # --- Patterns and heuristics ---
-        allowed_chars = string.ascii_letters + string.digits + string.punctuation + string.whitespace
-        allowed_chars_escaped = re.escape(allowed_chars)
-        self.allowed_chars_pattern = re.compile(rf"^[{allowed_chars_escaped}À-ÿ]+$")
-
-        self.url_pattern = re.compile(r"(?:https?://|www\.|ftp://)[^\s/$.?#]+\.[^\s]*", re.IGNORECASE)
-        self.gibberish_pattern = re.compile(
-            r"(?:\b(?=\w*[A-Z])(?=\w*[a-z])[A-Za-z]{4,}\b[\s]*){3,}"
-            r"|\b\w*\d+\w*\b|[A-Za-z]{15,}|(?:[^a-zA-Z0-9\s]|_){3,}"
-        )
-        self.emoji_pattern = re.compile(r"[\U0001F300-\U0001FAD6\U0001FAE0-\U0001FAFF]")
-
+        # --- Keyword sets (per instance, may be customized) ---
         self.spam_keywords: Set[str] = {"your spammiest words"} # common spam words: https://gist.github.com/prasidhda/13c9303be3cbc4228585a7f1a06040a3
         self.whitelist: Set[str] = {"your meanest words"} # profanity: https://github.com/zacanger/profane-words/blob/master/words.json
 
     # --- Detection Methods ---
 
     def contains_spam(self, message: str) -> bool:
-        """Detects spammy content: URLs, gibberish, emojis, or spam keywords."""
-        message = unicodedata.normalize("NFKC", message)
-        message = message.replace("\u200b", "").replace("\u200c", "").replace("\u200d", "")
-        message_lower = message.lower()
+        """
+        Detects spammy content: URLs, gibberish, emojis, or spam keywords.
+        Checks run cheapest/most selective first, the full-string fullmatch comes last.
+        """
+        if not message:
+            self.logger.debug("Rejected for disallowed characters.")  # same outcome as the fullmatch below
+            return True
 
-        if not self.allowed_chars_pattern.fullmatch(message):
-            self.logger.debug("Rejected for disallowed characters.")
+        # NFKC is the identity on ASCII and zero-width chars aren't ASCII: skip both for plain text
+        if not message.isascii():
+            import unicodedata
+
+            message = unicodedata.normalize("NFKC", message)
+            message = message.translate(_ZERO_WIDTH_TABLE)  # one pass instead of chained replace()
+
+        spam_re = _keywords_pattern(frozenset(self.spam_keywords - self.whitelist))
+        match = spam_re and spam_re.search(message)
+        if match:
+            self.logger.debug(f"Matched spam keyword: {match.group(0)!r}")
             return True
 
         if self.url_pattern.search(message):
             self.logger.debug("Detected URL in message.")
             return True
 
+        if len(self.emoji_pattern.findall(message)) > 3:
+            self.logger.debug("Detected excessive emojis.")
+            return True
+
         if self.gibberish_pattern.search(message):
             self.logger.debug("Detected gibberish pattern.")
             return True
 
-        if len(self.emoji_pattern.findall(message)) > 3:
-            self.logger.debug("Detected excessive emojis.")
+        if not self.allowed_chars_pattern.fullmatch(message):
+            self.logger.debug("Rejected for disallowed characters.")
             return True
 
-        spam_keywords = self.spam_keywords - self.whitelist
-        for keyword in spam_keywords:
-            if re.search(rf"\b{re.escape(keyword)}\b", message_lower):
-                self.logger.debug(f"Matched spam keyword: {keyword!r}")
-                return True
-
         return False
 
     def contains_contact_info(self, message: str) -> bool:
         """Detects email addresses or phone numbers."""
-        email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"
-        phone_pattern = r"(\+\d{1,3}[-.\s]?)?(\d{3}[-.\s]?){2}\d{4}"
-        if re.search(email_pattern, message, re.IGNORECASE) or re.search(phone_pattern, message):
+        if _EMAIL_RE.search(message) or _PHONE_RE.search(message):
             self.logger.debug("Detected contact info (email or phone).")
             return True
         return False
 
     def has_excessive_punctuation(self, message: str, max_allowed: int = 3) -> bool:
         """Detects runs of !, ?, or . beyond allowed threshold."""
-        if re.search(rf"([!?\.]){{{max_allowed + 1},}}", message):
-            self.logger.debug("Detected excessive punctuation.")
-            return True
+        run = 0
+        for c in message:
+            if c in self.RUN_PUNCTUATION:
+                run += 1
+                if run > max_allowed:
+                    self.logger.debug("Detected excessive punctuation.")
+                    return True
+            else:
+                run = 0
         return False
 
     def is_all_caps(self, message: str, threshold: float = 0.8) -> bool:
         """Checks if a message is mostly uppercase."""
         if len(message) < 5:
             return False
-        uppercase_ratio = sum(c.isupper() for c in message) / len(message)
+        if message.isascii():
+            # bytes.translate deleting everything but A-Z is a single C loop
+            uppercase = len(message.encode("ascii").translate(None, self.NON_UPPERCASE_ASCII))
+        else:
+            uppercase = sum(map(str.isupper, message))
+        uppercase_ratio = uppercase / len(message)
         if uppercase_ratio > threshold:
             self.logger.debug(f"Message mostly uppercase (ratio={uppercase_ratio:.2f}).")
             return True
@@ -239,36 +325,45 @@ class SpamDetector:
 
     def has_repeated_chars(self, message: str, max_repeats: int = 3) -> bool:
         """Detects long runs of the same character (e.g. helloooo)."""
-        if re.search(rf"(.)\1{{{max_repeats},}}", message):
-            self.logger.debug("Detected repeated characters.")
-            return True
+        if len(message) <= max_repeats:
+            return False
+        run, prev = 0, None
+        for c in message:
+            if c == "\n":  # a line break ends the run
+                run, prev = 0, None
+                continue
+            run = run + 1 if c == prev else 1
+            prev = c
+            if run > max_repeats:
+                self.logger.debug("Detected repeated characters.")
+                return True
         return False
 
     def has_suspicious_unicode(self, message: str) -> bool:
         """Detects Cyrillic or Arabic script mixed with Latin."""
-        if re.search(r"[\u0400-\u04FF\u0600-\u06FF]", message):
+        if message.isascii():  # C-level check, nothing to find in pure ASCII
+            return False
+        if _SUSPICIOUS_UNICODE_RE.search(message):
             self.logger.debug("Detected suspicious Unicode range (Cyrillic/Arabic).")
             return True
         return False
 
     def contains_profanity(self, message: str, extra_keywords: Set[str]) -> bool:
         """Detects custom profanity or banned words."""
-        profanity_words = set(extra_keywords)
-        message_lower = message.lower()
-        for w in profanity_words:
-            if re.search(rf"\b{re.escape(w)}\b", message_lower):
-                self.logger.debug(f"Matched profanity: {w!r}")
-                return True
+        profanity_re = _keywords_pattern(frozenset(extra_keywords))
+        match = profanity_re and profanity_re.search(message)
+        if match:
+            self.logger.debug(f"Matched profanity: {match.group(0)!r}")
+            return True
         return False
 
     def is_phishing(self, message: str, extra_keywords: Set[str]) -> bool:
         """Detects phishing-like keywords."""
-        phishing_keywords = set(extra_keywords)
-        message_lower = message.lower()
-        for k in phishing_keywords:
-            if k in message_lower:
-                self.logger.debug(f"Matched phishing keyword: {k!r}")
-                return True
+        phishing_re = _keywords_pattern(frozenset(extra_keywords), word_boundary=False)
+        match = phishing_re and phishing_re.search(message)
+        if match:
+            self.logger.debug(f"Matched phishing keyword: {match.group(0)!r}")
+            return True
         return False
 
     def has_hidden_chars(self, message: str) -> bool:
@@ -279,3 +374,76 @@ class SpamDetector:
                 self.logger.debug(f"Detected hidden character: {repr(c)}")
                 return True
         return False
+
+    # --- Batch moderation ---
+
+    def scan_batch(self, messages: list) -> list:
+        """
+        Scans many messages for bulk moderation (nightly sweeps, comment backfills).
+        Returns one set of SCAN_* ids per message, keywords are ordered as ``sorted(spam_keywords - whitelist)``.
+
+        With `hyperscan` installed, URL/email/phone/keyword patterns are compiled into a single
+        database and each message is scanned once; the gibberish pattern relies on lookaheads
+        that Hyperscan can't compile, so it always goes through `re`.
+        Without `hyperscan`, every pattern goes through `re`.
+        """
+        keywords = sorted(self.spam_keywords - self.whitelist)
+        db = self._get_scan_database(keywords) if hyperscan is not None else None
+        # re fallback: per-keyword patterns compiled once for the whole batch, not per message
+        keyword_res = [] if db is not None else [
+            re.compile(rf"\b{re.escape(keyword)}\b", re.IGNORECASE) for keyword in keywords
+        ]
+
+        results = []
+        for message in messages:
+            if isinstance(message, bytes):
+                message = message.decode("utf-8", errors="ignore")
+            matches = set()
+
+            if db is not None:
+                db.scan(message.encode("utf-8"), match_event_handler=self._on_scan_match, context=matches)
+            else:
+                if self.url_pattern.search(message):
+                    matches.add(self.SCAN_URL)
+                if _EMAIL_RE.search(message):
+                    matches.add(self.SCAN_EMAIL)
+                if _PHONE_RE.search(message):
+                    matches.add(self.SCAN_PHONE)
+                for i, keyword_re in enumerate(keyword_res):
+                    if keyword_re.search(message):
+                        matches.add(self.SCAN_KEYWORD_BASE + i)
+
+            if self.gibberish_pattern.search(message):
+                matches.add(self.SCAN_GIBBERISH)
+            results.append(matches)
+        return results
+
+    @staticmethod
+    def _on_scan_match(match_id, start, end, flags, context):
+        context.add(match_id)  # returning None keeps the scan going
+
+    def _get_scan_database(self, keywords: list):
+        """Compiles (once per keyword set) the Hyperscan database used by scan_batch()."""
+        cache_key = tuple(keywords)
+        cached = getattr(self, "_scan_database", None)
+        if cached and cached[0] == cache_key:
+            return cached[1]
+
+        caseless = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+        expressions = [self.url_pattern.pattern, _EMAIL_RE.pattern, _PHONE_RE.pattern]
+        ids = [self.SCAN_URL, self.SCAN_EMAIL, self.SCAN_PHONE]
+        flags = [caseless, caseless, hyperscan.HS_FLAG_SINGLEMATCH]
+        for i, keyword in enumerate(keywords):
+            expressions.append(rf"\b{re.escape(keyword)}\b")
+            ids.append(self.SCAN_KEYWORD_BASE + i)
+            flags.append(caseless)
+
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[e.encode("utf-8") for e in expressions],
+            ids=ids,
+            elements=len(expressions),
+            flags=flags,
+        )
+        self._scan_database = (cache_key, db)
+        return db
@@ -3,17 +3,39 @@ import secrets
 import string
 import re
 
+from django.db.models import Q
 from django.utils.text import slugify
-from django.contrib.auth.hashers import identify_hasher
+from django.contrib.auth.hashers import get_hashers_by_algorithm
 # * ==========================================================
 # * String & miscellaneous Utilities
 # * ==========================================================
 
+# Token alphabet built once (not re-concatenated per call)
+_ALPHANUMERIC = string.ascii_letters + string.digits
+
+# humanize_timedelta units, largest first (constant tuple, not rebuilt per call)
+_TIMEDELTA_PERIODS = (
+    ("year", 60 * 60 * 24 * 365),
+    ("month", 60 * 60 * 24 * 30),
+    ("day", 60 * 60 * 24),
+    ("hour", 60 * 60),
+    ("minute", 60),
+    ("second", 1),
+)
+
+# Compiled once at import (raw_text)
+_NEWLINE_RE = re.compile(r'[\r\n\t]+')
+# everything raw_text doesn't keep (emojis included): one C-level pass instead of a per-char Python loop
+_RAW_TEXT_DISALLOWED_RE = re.compile(
+    "[^" + re.escape(string.ascii_letters + string.digits + string.punctuation + " " + "éèêëàâäôöûüùçÉÈÊËÀÂÄÔÖÛÜÙÇ") + "]"
+)
+_MULTI_SPACE_RE = re.compile(r'\s{2,}')
+
 
 def mask_email(email: str) -> str:
     """
     Masks an email address for privacy, keeping only the first character of the username
-    and the full domain.
+    and the full domain. Deliberately not memoized: a cache would keep raw addresses (personal data) in memory.
 
     Args:
         email (str): The email address to mask.
@@ -29,8 +51,8 @@ def mask_email(email: str) -> str:
         return email
     name, domain = email.split("@", 1)
     if len(name) <= 1:
-        return "*" + "@" + domain
-    return name[0] + "*" * (len(name) - 1) + "@" + domain
+        return f"*@{domain}"
+    return f"{name[0]}{'*' * (len(name) - 1)}@{domain}"
 
 
 def mask_string(s: str, visible_start: int = 2, visible_end: int = 2, mask_char: str = "*") -> str:
@@ -69,16 +91,8 @@ def humanize_timedelta(dt):
     if isinstance(dt, (int, float)):
         dt = datetime.timedelta(seconds=dt)
     seconds = int(dt.total_seconds())
-    periods = [
-        ("year", 60 * 60 * 24 * 365),
-        ("month", 60 * 60 * 24 * 30),
-        ("day", 60 * 60 * 24),
-        ("hour", 60 * 60),
-        ("minute", 60),
-        ("second", 1),
-    ]
     strings = []
-    for period_name, period_seconds in periods:
+    for period_name, period_seconds in _TIMEDELTA_PERIODS:
         if seconds >= period_seconds:
             period_value, seconds = divmod(seconds, period_seconds)
             strings.append(
@@ -87,27 +101,59 @@ def humanize_timedelta(dt):
     return ", ".join(strings) or "0 seconds"
 
 
-def random_string(length=12, chars=string.ascii_letters + string.digits):
+# private function
+def _secure_choices(alphabet: str, length: int) -> str:
+    """
+    Picks `length` characters from `alphabet` out of one `secrets.token_bytes` block
+    (rejection sampling keeps the distribution uniform) instead of one urandom read per char.
+    """
+    n = len(alphabet)
+    if n == 0:
+        raise ValueError("alphabet must not be empty")  # the sampling loop below would never end
+    if n > 256:
+        return "".join(secrets.choice(alphabet) for _ in range(length))
+    mask = (1 << (n - 1).bit_length()) - 1
+    out = []
+    while len(out) < length:
+        for b in secrets.token_bytes(length * 2):
+            v = b & mask
+            if v < n:
+                out.append(alphabet[v])
+                if len(out) == length:
+                    break
+    return "".join(out)
+
+
+def random_string(length=12, chars=_ALPHANUMERIC):
     """
     Generates a random string of given length.
+    For hex tokens prefer `secrets.token_hex(length // 2)` directly.
     """
-    # Use secrets.choice for cryptographic randomness when generating tokens
-    return "".join(secrets.choice(chars) for _ in range(length))
+    # cryptographic randomness, drawn in bulk when generating tokens
+    return _secure_choices(chars, length)
 
 
 def unique_slugify(instance, value, slug_field_name="slug"):
     """
     Generates a unique slug for a model instance.
+    Fetches ``slug`` and the ``slug-...`` candidates in a single (index-friendly LIKE) query
+    and picks the smallest free suffix in Python.
+    A value that slugifies to "" (e.g. "!!!") falls back to the model name ("post", "post-1", ...).
+    Note: keep a unique constraint on the field, concurrent saves can still collide.
     """
-    slug = slugify(value)
     ModelClass = instance.__class__
+    # never query with an empty slug: LIKE '-%' would match unrelated rows
+    slug = slugify(value) or ModelClass._meta.model_name
+    existing = set(
+        ModelClass.objects.filter(
+            Q(**{slug_field_name: slug}) | Q(**{f"{slug_field_name}__startswith": f"{slug}-"})
+        )
+        .exclude(pk=instance.pk)
+        .values_list(slug_field_name, flat=True)
+    )
     unique_slug = slug
     num = 1
-    while (
-        ModelClass.objects.filter(**{slug_field_name: unique_slug})
-        .exclude(pk=instance.pk)
-        .exists()
-    ):
+    while unique_slug in existing:
         unique_slug = f"{slug}-{num}"
         num += 1
     setattr(instance, slug_field_name, unique_slug)
@@ -122,10 +168,8 @@ def secure_random_code(length: int = 6, digits_only: bool = True) -> str:
     Uses the `secrets` module and is suitable for 2FA codes or short tokens.
     """
     if digits_only:
-        alphabet = '0123456789'
-    else:
-        alphabet = string.digits + string.ascii_letters
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+        return f"{secrets.randbelow(10 ** length):0{length}d}" if length > 0 else ''
+    return _secure_choices(_ALPHANUMERIC, length)
 
 
 def raw_text(value: str) -> str:
@@ -142,17 +186,13 @@ def raw_text(value: str) -> str:
         return ""
 
     # Replace newlines and tabs with a space
-    text = re.sub(r'[\r\n\t]+', ' ', value)
-
-    # Remove emojis and other non-standard unicode symbols
-    text = re.sub(r'[\U00010000-\U0010ffff]', '', text)
+    text = _NEWLINE_RE.sub(' ', value)
 
-    # Keep only alphanumeric, punctuation, and spaces
-    allowed = string.ascii_letters + string.digits + string.punctuation + " " + "éèêëàâäôöûüùçÉÈÊËÀÂÄÔÖÛÜÙÇ"
-    text = ''.join(ch for ch in text if ch in allowed)
+    # Keep only alphanumeric, punctuation, and spaces (also drops emojis and other unicode symbols)
+    text = _RAW_TEXT_DISALLOWED_RE.sub('', text)
 
     # Collapse multiple spaces
-    text = re.sub(r'\s{2,}', ' ', text)
+    text = _MULTI_SPACE_RE.sub(' ', text)
 
     return text.strip()
 
@@ -163,15 +203,20 @@ def is_strong_password(password: str) -> bool:
     """
     if len(password) < 8:
         return False
-    if not re.search(r"[A-Z]", password):  # At least 1 uppercase
-        return False
-    if not re.search(r"[a-z]", password):  # At least 1 lowercase
-        return False
-    if not re.search(r"[0-9]", password):  # At least 1 digit
-        return False
-    if not re.search(r"[^A-Za-z0-9]", password):  # At least 1 symbol
-        return False
-    return True
+    # single pass, stops as soon as every class has been seen
+    has_upper = has_lower = has_digit = has_symbol = False
+    for c in password:
+        if "A" <= c <= "Z":
+            has_upper = True
+        elif "a" <= c <= "z":
+            has_lower = True
+        elif "0" <= c <= "9":
+            has_digit = True
+        else:  # anything else counts as a symbol (accented letters included)
+            has_symbol = True
+        if has_upper and has_lower and has_digit and has_symbol:
+            return True
+    return False
 
 
 
@@ -179,13 +224,17 @@ def is_strong_password(password: str) -> bool:
 def check_if_hashed(password: str) -> bool:
     """
     Returns True if `password` is a recognized Django password hash.
-    Uses Django's hasher introspection instead of regex guessing.
+    Uses Django's hasher introspection instead of regex guessing
+    (get_hashers_by_algorithm is cached by Django and reset when PASSWORD_HASHERS changes).
     """
     if not password or not isinstance(password, str):
         return False
 
-    try:
-        identify_hasher(password)  # raises ValueError if unrecognized
-        return True
-    except ValueError:
-        return False
+    # same prefix rules as identify_hasher, minus the hasher lookup and the exception
+    if (len(password) == 32 and "$" not in password) or (len(password) == 37 and password.startswith("md5$$")):
+        algorithm = "unsalted_md5"
+    elif len(password) == 46 and password.startswith("sha1$$"):
+        algorithm = "unsalted_sha1"
+    else:
+        algorithm = password.split("$", 1)[0]
+    return algorithm in get_hashers_by_algorithm()
@@ -1,4 +1,6 @@
-import random
+import hashlib
+import hmac
+from functools import lru_cache
 
 from django.shortcuts import render, redirect, resolve_url
 from django.urls import reverse
@@ -10,81 +12,69 @@ from django.contrib.auth import authenticate, login
 from django.utils.translation import gettext_lazy as _
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import get_user_model, logout
-from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_decode
+from django.contrib.auth import logout
 from django_ratelimit.decorators import ratelimit
 from django.conf import settings
-import time
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_POST, require_http_methods
 from django.contrib.auth.decorators import login_required
-from django.core.signing import BadSignature, SignatureExpired, TimestampSigner
+from django.core.signing import BadSignature, SignatureExpired
 
 from .forms import LoginForm, LanguageTogglerForm
 from .utils.decorators import not_authenticated_required, ajax_required
+from .utils.api_utils import get_redirect_allowed_hosts
 from .utils.email_utils import send_verification_email, send_2fa_code
+from .utils.email_utils import TWO_FA_SESSION_KEY, TWO_FA_SIGNER, TWO_FA_MAX_AGE
+from .utils.email_utils import EMAIL_VERIFICATION_SIGNER, EMAIL_VERIFICATION_MAX_AGE
 
 from .models import User
 
 
 
-
-def verify_email(request, uidb64, token, signed_ts):
-
-    TOKEN_EXPIRATION_TIME = 24*3600  # 1 day
-    signer = TimestampSigner()
-
+def verify_email(request, token):
+    """
+    The link token is a signed {"uid", "email"} object: checking it needs no DB read and
+    its timestamp gives the expiry. Verification is then a single conditional UPDATE.
+    """
     try:
-        uid = urlsafe_base64_decode(uidb64).decode()  # Decode the user ID
-        user = get_user_model().objects.get(pk=uid)
-    except (TypeError, ValueError, OverflowError, get_user_model().DoesNotExist):
-        user = None
-
-        # Calculate and check token expiration
-        try:
-            signer.unsign(signed_ts, max_age=TOKEN_EXPIRATION_TIME)
-        except (SignatureExpired):
-            messages.error(request, _("Unfortunately it seems that your link has expired"))
-            return render(request, "http_templates/410_token_expired.html", status=410)
-        
-        except (ValueError, BadSignature):
-            return render(request, "http_templates/410_invalid_token.html", status=410)
-        
-
-    if user and default_token_generator.check_token(user, token):
+        data = EMAIL_VERIFICATION_SIGNER.unsign_object(token, max_age=EMAIL_VERIFICATION_MAX_AGE)
+    except SignatureExpired:
+        messages.error(request, _("Unfortunately it seems that your link has expired"))
+        return render(request, "http_templates/410_invalid_token.html", status=410)
+    except BadSignature:
+        return render(request, "http_templates/410_invalid_token.html", status=410)
 
-        #skip if user is already verified
-        if user.is_email_verified:
-            messages.info(request, _("your account is already email verified ! it seems you have clicked an old verification link, you can connect directly") )
-            return redirect("accounts:login")
+    updated = User.objects.filter(
+        pk=data["uid"], email=data["email"], is_email_verified=False
+    ).update(is_email_verified=True)
 
-        #check if link is expired
-        else:
-            user.is_email_verified = True
-            user.save()
-            messages.success(request, _("Success! you account is now up and ready to go"))
-            return redirect("accounts:login")        
+    if not updated:
+        # rare path: tell "already verified" apart from a deleted user / changed email (invalid link)
+        if not User.objects.filter(pk=data["uid"], email=data["email"]).exists():
+            return render(request, "http_templates/410_invalid_token.html", status=410)
+        messages.info(request, _("your account is already email verified ! it seems you have clicked an old verification link, you can connect directly") )
+        return redirect("accounts:login")
 
-    else:
-        return render(request, "http_templates/410_invalid_token.html", status=410)
+    messages.success(request, _("Success! you account is now up and ready to go"))
+    return redirect("accounts:login")
 
 
 
+@require_http_methods(["GET", "HEAD", "POST"])
 @ratelimit(key="ip", rate="10000/m", method="POST", block=True)
 def login_view(request):
-    form = LoginForm(request.POST or None)  # GET requests get an empty form
-
     next_url = request.GET.get("next") or resolve_url("accounts:profile")  # Resolve URL name
 
     if not url_has_allowed_host_and_scheme(
-        url=next_url, allowed_hosts={request.get_host()}
+        url=next_url, allowed_hosts=get_redirect_allowed_hosts(request)
         ):
         next_url = reverse("accounts:profile")  # Fallback to a safe URL
 
     if request.method == "POST":
+        form = LoginForm(request.POST)
         if form.is_valid():
-            email = form.cleaned_data.get("email").lower().strip()
+            email = form.cleaned_data.get("email")  # already normalized by LoginForm.clean_email
 
             password = form.cleaned_data.get("password")
 
@@ -114,6 +104,8 @@ def login_view(request):
                 form.add_error(None, _("invalid credentials "))
         else:
             messages.error(request, _("please correct the errors of the form"))
+    else:
+        form = LoginForm()  # GET requests get an unbound form
 
     context = {
         "form": form,
@@ -127,8 +119,8 @@ def login_view(request):
 def logout_view(request):
     user = request.user
     if user.enabled_2fa:
-        user.is_2fa_authenticated = False
-        user.save(update_fields=['is_2fa_authenticated'])  # safer and faster than .save() with no args
+        # single-column UPDATE, no model save() machinery (signals, field pre_save loop)
+        User.objects.filter(pk=user.pk).update(is_2fa_authenticated=False)
     logout(request)
     return redirect('accounts:login')
 
@@ -138,38 +130,33 @@ def logout_view(request):
 @not_authenticated_required
 @ratelimit(key="ip", rate="10000/m", method="POST", block=True)
 def verify_2fa(request):
-    # ? Retrieve session values
-    session_code = request.session.get('2fa_code')
-    created_at_raw = request.session.get('2fa_created_at')
-    user_id = request.session.get('2fa_user_id')
-
-    # ? Validate session presence
-    if not session_code or not created_at_raw or not user_id:
-        return render(request, "http_templates/403_prohibited.html", status=403)
-
-    try:
-        created_at = int(created_at_raw)
-    except (TypeError, ValueError):
+    # ? Retrieve the signed 2FA state (one session key)
+    signed_state = request.session.get(TWO_FA_SESSION_KEY)
+    if not signed_state:
         return render(request, "http_templates/403_prohibited.html", status=403)
 
     if request.method == 'POST':
-        MAX_AGE = 15 * 60  # 15 minutes
-        code = request.POST.get('code', '').strip()
+        # ? expiry is checked by the signer itself
+        try:
+            state = TWO_FA_SIGNER.unsign_object(signed_state, max_age=TWO_FA_MAX_AGE)
+        except SignatureExpired:
+            # ! Expired
+            request.session.pop(TWO_FA_SESSION_KEY, None)
+            messages.error(request, _("Your code has expired, please re-authenticate."))
+            return redirect('accounts:login')
+        except BadSignature:
+            request.session.pop(TWO_FA_SESSION_KEY, None)
+            return render(request, "http_templates/403_prohibited.html", status=403)
 
-        if code == session_code:
-            if int(time.time()) - created_at > MAX_AGE:
-                # ! Expired
-                for key in ['2fa_code', '2fa_created_at', '2fa_user_id']:
-                    request.session.pop(key, None)
-                messages.error(request, _("Your code has expired, please re-authenticate."))
-                return redirect('accounts:login')
+        code = request.POST.get('code', '').strip()
 
+        # constant-time comparison, no timing side-channel on the code hash
+        if hmac.compare_digest(hashlib.sha256(code.encode()).hexdigest(), state.get('code_hash') or ''):
             try:
-                user = User.objects.get(id=user_id)
-                user.is_2fa_authenticated = True
-                user.save(update_fields=['is_2fa_authenticated'])
-                for key in ['2fa_code', '2fa_created_at', '2fa_user_id']:
-                    request.session.pop(key, None)
+                user = User.objects.get(id=state['uid'])
+                User.objects.filter(pk=user.pk).update(is_2fa_authenticated=True)
+                user.is_2fa_authenticated = True  # keep the in-memory instance in sync
+                request.session.pop(TWO_FA_SESSION_KEY, None)
                 login(request, user)
                 return redirect('accounts:profile')  # or next_url
             except User.DoesNotExist:
@@ -186,7 +173,7 @@ def verify_2fa(request):
 def toggle_2fa_status_ajax(request):
     user = request.user
     user.enabled_2fa = not user.enabled_2fa
-    user.save(update_fields=['enabled_2fa'])
+    User.objects.filter(pk=user.pk).update(enabled_2fa=user.enabled_2fa)
     return JsonResponse({'success': True, 'enabled_2fa': user.enabled_2fa})
 
 
@@ -217,24 +204,34 @@ def set_language(request):
 
 
 
+# private function
+@lru_cache(maxsize=None)
+def _error_page_body(template_name):
+    """Error templates are static (no request/user data): rendered once per process, then reused."""
+    return render_to_string(template_name).encode()
+
+
+# private function
+def _error_response(template_name, status):
+    return HttpResponse(_error_page_body(template_name), status=status, content_type="text/html; charset=utf-8")
+
+
 def custom_404(request, *args, **kwargs):
-    return render(request, "http_templates/404.html", status=404)
+    return _error_response("http_templates/404.html", 404)
 
 
 def custom_403(request, exception=None):
 
-    return render(request, "http_templates/403_prohibited.html", status=403)
+    return _error_response("http_templates/403_prohibited.html", 403)
 
 def csrf_failure(request, reason=""):
     #alternatively create a 403_csrf.html with template priority
-    return render(request, "http_templates/403_prohibited.html", status=403)
+    return _error_response("http_templates/403_prohibited.html", 403)
 
 
 def custom_400(request, *args, **kwargs):
-    return render(request, "http_templates/400_bad_request.html", status=400)
+    return _error_response("http_templates/400_bad_request.html", 400)
 
 
 def custom_500(request, *args, **kwargs):
-    return render(request, "http_templates/500_internal_server_error.html", status=500)
-
-
+    return _error_response("http_templates/500_internal_server_error.html", 500)
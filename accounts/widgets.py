@@ -5,11 +5,28 @@
 
 from django import forms
 import json
+from functools import lru_cache
+
+from .utils.json_utils import json_dumps
 # ? ----------------------------------------------------------------
 # ? end imports
 # ? ----------------------------------------------------------------
 
 
+# private function
+@lru_cache(maxsize=512)
+def _parse_json_items(raw: str) -> tuple:
+    """Decoded (key, value) pairs of a JSON object string, memoized: the same stored value is re-rendered on every admin page."""
+    return tuple(json.loads(raw).items())  # stdlib: exact ints, this is what the user edits
+
+
+# private function
+@lru_cache(maxsize=256)
+def _field_names(name: str) -> tuple:
+    """POST names of the key/value inputs for a widget name, built once per (formset) field name."""
+    return f'{name}_key', f'{name}_value'
+
+
 # a solution to make json fields more user-friendly
 class KeyValueWidget(forms.Widget):
     """
@@ -28,15 +45,17 @@ class KeyValueWidget(forms.Widget):
     template_name = 'widgets/key_value_widget.html'
 
     def value_from_datadict(self, data, files, name):
-        keys = data.getlist(f'{name}_key')
-        values = data.getlist(f'{name}_value')
-        return json.dumps(dict(zip(keys, values)))
+        key_name, value_name = _field_names(name)
+        keys = data.getlist(key_name)
+        values = data.getlist(value_name)
+        # one pass, blank rows (the JS always appends an empty one) never reach the JSON payload
+        return json_dumps({k: v for k, v in zip(keys, values) if k and not k.isspace()})
 
     def format_value(self, value):
-        if value is None:
+        if not value:
             return []
         if isinstance(value, str):
-            value = json.loads(value)
+            return _parse_json_items(value)
         return value.items()
 
 
@@ -60,7 +79,7 @@ class PDFPreviewWidget(forms.ClearableFileInput):
 
     def get_context(self, name, value, attrs):
         context = super().get_context(name, value, attrs)
-        context['pdf_url'] = value.url if value and hasattr(value, 'url') else None
+        context['pdf_url'] = getattr(value, 'url', None) if value else None  # single attribute lookup
         return context
     
 
@@ -75,7 +94,7 @@ class VideoPreviewWidget(forms.ClearableFileInput):
     
     def get_context(self, name, value, attrs):
         context = super().get_context(name, value, attrs)
-        context['video_url'] = value.url if value and hasattr(value, 'url') else None
+        context['video_url'] = getattr(value, 'url', None) if value else None  # single attribute lookup
         return context
 
 
@@ -89,7 +108,7 @@ class ImagePreviewWidget(forms.ClearableFileInput):
     
     def get_context(self, name, value, attrs):
         context = super().get_context(name, value, attrs)
-        context['image_url'] = value.url if value and hasattr(value, 'url') else None
+        context['image_url'] = getattr(value, 'url', None) if value else None  # single attribute lookup
         return context
 
 
@@ -1,15 +1,23 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
 
 
-def home_view(request):
+# demo toasts, built once (one message per level)
+_DEMO_MESSAGES = (
+    (messages.SUCCESS, 'success , lorem ipsm soemthi sdas auto der nacht'),
+    (messages.ERROR, 'error , lorem ipsm soemthi sdas auto der nacht'),
+    (messages.WARNING, 'warning , lorem ipsm soemthi sdas auto der nacht'),
+    (messages.INFO, 'info , lorem ipsm soemthi sdas auto der nacht'),
+)
 
-    messages.success(request, 'success , lorem ipsm soemthi sdas auto der nacht')
-    messages.error(request, 'error , lorem ipsm soemthi sdas auto der nacht')
-    messages.warning(request, 'warning , lorem ipsm soemthi sdas auto der nacht')
-    messages.info(request, 'info , lorem ipsm soemthi sdas auto der nacht')
 
-    return render(request, "home/home.html")
+def home_view(request):
 
+    # ? demo only: production homepage hits don't queue (and serialize) messages
+    if settings.DEBUG:
+        for level, message in _DEMO_MESSAGES:
+            messages.add_message(request, level, message)
 
+    return render(request, "home/home.html")